@@ -0,0 +1,107 @@
+#----------------------------------------------------
+# Mini BearTracks - course catalog
+# Purpose of program: List every course with its timeslot, lecturer, capacity and open seats,
+# with filters and pagination, for both the Streamlit app and the command line version.
+#----------------------------------------------------
+from collections import Counter
+
+import parsers
+
+PAGE_SIZE = 25
+
+
+def count_enrollments():
+    """
+    Counts the enrolled students of every course in a single pass over enrollment.txt.
+
+    Inputs: None
+
+    Returns: Counter: course name -> number of enrolled students
+    """
+    return Counter(course_name for course_name, _ in parsers.read_enrollment())
+
+
+def load_catalog(seat_counts=None):
+    """
+    Builds the catalog rows from courses.txt and the enrollment counters.
+
+    Inputs: seat_counts (Counter): Enrolled students per course. Counted from
+                                   enrollment.txt when not given.
+
+    Returns: list: One dict per course with course, subject, days, time, lecturer,
+                   capacity and open_seats keys, in file order.
+    """
+    if seat_counts is None:
+        seat_counts = count_enrollments()
+
+    catalog = []
+    for course_name, timeslot, capacity, lecturer in parsers.read_courses():
+        days, time = timeslot.split()
+        catalog.append({
+            "course": course_name,
+            "subject": course_name.split()[0],
+            "days": days,
+            "time": time,
+            "lecturer": lecturer,
+            "capacity": capacity,
+            "open_seats": capacity - seat_counts[course_name],
+        })
+    return catalog
+
+
+def filter_catalog(catalog, subject=None, days=None, time=None, has_seats=False):
+    """
+    Keeps only the catalog rows matching every given filter (empty filters match everything).
+
+    Inputs: catalog (list): Rows from load_catalog().
+            subject (str): Subject code such as "CMPUT".
+            days (str): Day pattern, "MWF" or "TR".
+            time (str): Start time such as "9:00" (or "09:00").
+            has_seats (bool): Only keep courses with at least one open seat.
+
+    Returns: list: The matching rows.
+    """
+    subject = subject.strip().upper() if subject else None
+    days = days.strip().upper() if days else None
+    if time and time.strip():
+        # Same normalization as the stored timeslots, so "09:00" matches "9:00"
+        timeslot = parsers.normalize_timeslot(f"MWF {time}")
+        time = timeslot.split()[1] if timeslot else time.strip()
+    else:
+        time = None
+    return [row for row in catalog
+            if (not subject or row["subject"] == subject)
+            and (not days or row["days"] == days)
+            and (not time or row["time"] == time)
+            and (not has_seats or row["open_seats"] > 0)]
+
+
+def paginate(rows, page, page_size=PAGE_SIZE):
+    """
+    Returns a single page of rows.
+
+    Inputs: rows (list): The rows to split into pages.
+            page (int): Page number, starting at 1. Clamped to the valid range.
+            page_size (int): Number of rows per page.
+
+    Returns: tuple: The rows on the page, the clamped page number and the total number of pages.
+    """
+    total_pages = max(1, -(-len(rows) // page_size))
+    page = min(max(1, page), total_pages)
+    start = (page - 1) * page_size
+    return rows[start:start + page_size], page, total_pages
+
+
+def format_catalog_page(rows):
+    """
+    Formats catalog rows as a fixed-width text table.
+
+    Inputs: rows (list): Rows from load_catalog().
+
+    Returns: str: The table, including a header line.
+    """
+    lines = [f"{'Course':<11}{'Time':<11}{'Lecturer':<24}{'Capacity':>9}{'Open':>6}"]
+    for row in rows:
+        lines.append(f"{row['course']:<11}{row['days'] + ' ' + row['time']:<11}{row['lecturer'][:23]:<24}"
+                     f"{row['capacity']:>9}{row['open_seats']:>6}")
+    return "\n".join(lines)
@@ -0,0 +1,221 @@
+#----------------------------------------------------
+# Mini BearTracks - instructor and room conflicts
+# Purpose of program: Keep lecturers and rooms from being double-booked and rooms from being
+# overfilled when courses are added or edited, and audit the whole catalog for conflicts.
+#
+# rooms.txt holds "ROOM; capacity" lines and course_rooms.txt holds "COURSE: ROOM" lines.
+#
+# Usage: python conflicts.py   (prints every existing conflict)
+#----------------------------------------------------
+import os
+
+import parsers
+
+UNASSIGNED_LECTURERS = {"STAFF", "TBA", ""}  # Placeholders that can be in many places at once
+DATA_FILES = ("courses.txt", "course_rooms.txt", "rooms.txt")
+
+# Data and indexes used by check_course(), rebuilt only when one of DATA_FILES changes
+_index_cache = {"stamps": None}
+
+
+def slot_key(timeslot):
+    """
+    Normalizes a timeslot so equal slots always give the same key.
+
+    Inputs: timeslot (str): A timeslot such as "MWF 9:00".
+
+    Returns: tuple: (day pattern, start time), e.g. ("MWF", "9:00")
+    """
+    days, time = timeslot.split()
+    return days.upper(), time.lstrip("0") or "0"
+
+
+def load_rooms():
+    """
+    Reads the available rooms and their capacities.
+
+    Inputs: None
+
+    Returns: dict: room name -> capacity
+    """
+    if not os.path.exists("rooms.txt"):
+        return {}
+    return dict(parsers.read_rooms())
+
+
+def load_course_rooms():
+    """
+    Reads which room each course is taught in.
+
+    Inputs: None
+
+    Returns: dict: course name -> room name
+    """
+    course_rooms = {}
+    if not os.path.exists("course_rooms.txt"):
+        return course_rooms
+    with open("course_rooms.txt", "r") as f:
+        for line in f:
+            if ':' in line:
+                course_name, room = line.split(':', 1)
+                course_rooms[parsers.normalize_course(course_name)] = " ".join(room.split()).upper()
+    return course_rooms
+
+
+def set_course_room(course_name, room):
+    """
+    Assigns a room to a course, replacing any previous assignment.
+
+    Inputs: course_name (str): Name of the course.
+            room (str): Name of the room, or None to remove the course's assignment.
+
+    Returns: None
+    """
+    course_rooms = load_course_rooms()
+    course_rooms.pop(course_name, None)
+    if room:
+        course_rooms[course_name] = room.upper()
+    with open("course_rooms.txt", "w") as f:
+        f.write("\n".join(f"{name}: {assigned}" for name, assigned in course_rooms.items()))
+
+
+def load_courses():
+    """
+    Reads courses.txt.
+
+    Inputs: None
+
+    Returns: dict: course name -> {"timeslot", "max_students", "lecturer"}
+    """
+    return parsers.load_courses()
+
+
+def build_indexes(courses_data, course_rooms):
+    """
+    Indexes the courses by (lecturer, slot) and (room, slot).
+
+    Inputs: courses_data (dict): Courses from load_courses().
+            course_rooms (dict): Room assignments from load_course_rooms().
+
+    Returns: tuple: Two dicts, (lecturer, slot) -> [course names] and (room, slot) -> [course names].
+    """
+    lecturer_index = {}
+    room_index = {}
+    for course_name, details in courses_data.items():
+        slot = slot_key(details["timeslot"])
+        lecturer = details["lecturer"].upper()
+        if lecturer not in UNASSIGNED_LECTURERS:
+            lecturer_index.setdefault((lecturer, slot), []).append(course_name)
+        room = course_rooms.get(course_name)
+        if room:
+            room_index.setdefault((room, slot), []).append(course_name)
+    return lecturer_index, room_index
+
+
+def _cached_indexes():
+    """
+    Returns the rooms and both indexes, reading the data files again only if one of them
+    changed since the last call.
+
+    Inputs: None
+
+    Returns: tuple: (rooms, lecturer index, room index)
+    """
+    stamps = []
+    for path in DATA_FILES:
+        try:
+            stat = os.stat(path)
+            stamps.append((stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            stamps.append(None)
+    if stamps != _index_cache["stamps"]:
+        rooms = load_rooms()
+        lecturer_index, room_index = build_indexes(load_courses(), load_course_rooms())
+        _index_cache.update(stamps=stamps, rooms=rooms, lecturer_index=lecturer_index, room_index=room_index)
+    return _index_cache["rooms"], _index_cache["lecturer_index"], _index_cache["room_index"]
+
+
+def check_course(course_name, timeslot, max_students, lecturer, room, courses_data=None, course_rooms=None, rooms=None):
+    """
+    Checks a new or edited course against every other course.
+
+    Inputs: course_name (str): Name of the course being added or edited (ignored in the indexes).
+            timeslot (str): Its timeslot, e.g. "TR 14:00".
+            max_students (int): Its maximum number of students.
+            lecturer (str): Its lecturer.
+            room (str): Its room, or None if no room is assigned.
+            courses_data, course_rooms, rooms: Data to check against instead of the files. When
+                                               none are given, the indexes of the files are reused
+                                               until one of them changes.
+
+    Returns: list: A message for each problem found (empty if the course can be saved).
+    """
+    if parsers.normalize_timeslot(timeslot) is None:
+        return [f"Timeslot {timeslot!r} is not like 'MWF 9:00' or 'TR 14:00'."]
+    if courses_data is None and course_rooms is None and rooms is None:
+        rooms, lecturer_index, room_index = _cached_indexes()
+    else:
+        if courses_data is None:
+            courses_data = load_courses()
+        if course_rooms is None:
+            course_rooms = load_course_rooms()
+        if rooms is None:
+            rooms = load_rooms()
+        lecturer_index, room_index = build_indexes(courses_data, course_rooms)
+
+    problems = []
+    slot = slot_key(timeslot)
+    slot_text = f"{slot[0]} {slot[1]}"
+    if lecturer.upper() not in UNASSIGNED_LECTURERS:
+        for other in lecturer_index.get((lecturer.upper(), slot), []):
+            if other != course_name:
+                problems.append(f"{lecturer} is already teaching {other} on {slot_text}.")
+    if room:
+        room = room.upper()
+        if room not in rooms:
+            problems.append(f"Room {room} does not exist.")
+        else:
+            if max_students > rooms[room]:
+                problems.append(f"Room {room} only holds {rooms[room]} students, not {max_students}.")
+            for other in room_index.get((room, slot), []):
+                if other != course_name:
+                    problems.append(f"Room {room} is already booked for {other} on {slot_text}.")
+    return problems
+
+
+def audit():
+    """
+    Finds every lecturer double-booking, room double-booking and over-capacity room in one
+    pass over the catalog.
+
+    Inputs: None
+
+    Returns: list: A message for each conflict found.
+    """
+    courses_data = load_courses()
+    course_rooms = load_course_rooms()
+    rooms = load_rooms()
+    lecturer_index, room_index = build_indexes(courses_data, course_rooms)
+
+    problems = []
+    for (lecturer, (days, time)), course_names in lecturer_index.items():
+        if len(course_names) > 1:
+            problems.append(f"Lecturer {courses_data[course_names[0]]['lecturer']} is double-booked on {days} {time}: {', '.join(course_names)}")
+    for (room, (days, time)), course_names in room_index.items():
+        if len(course_names) > 1:
+            problems.append(f"Room {room} is double-booked on {days} {time}: {', '.join(course_names)}")
+    for course_name, room in course_rooms.items():
+        if course_name not in courses_data:
+            continue
+        if room not in rooms:
+            problems.append(f"{course_name} is assigned to unknown room {room}")
+        elif courses_data[course_name]["max_students"] > rooms[room]:
+            problems.append(f"{course_name} allows {courses_data[course_name]['max_students']} students but room {room} only holds {rooms[room]}")
+    return problems
+
+
+if __name__ == "__main__":
+    problems = audit()
+    for problem in problems:
+        print(problem)
+    print(f"{len(problems)} conflict(s) found.")
@@ -0,0 +1,320 @@
+#----------------------------------------------------
+# Mini BearTracks - event journal
+# Purpose of program: Record every change made to the data files (who did what and when),
+# take periodic binary snapshots of the full state, and restore the data files as of any
+# point in time by loading the nearest snapshot and replaying only the events after it.
+#
+# Usage: python journal.py restore "2026-10-19 14:30:00"
+#        python journal.py snapshot
+#----------------------------------------------------
+import json
+import os
+import pickle
+import sys
+import time
+from datetime import datetime
+
+import conflicts
+import parsers
+
+JOURNAL_FILE = "journal.txt"
+SNAPSHOT_DIR = "snapshots"
+SNAPSHOT_EVERY = 1000  # Take a snapshot after this many events
+
+_has_baseline = False  # Whether ensure_baseline() already found or took a snapshot
+
+
+def read_state():
+    """
+    Reads the current contents of the data files.
+
+    Inputs: None
+
+    Returns: dict: The full state with "courses", "students", "enrollment" and "rooms" keys.
+    """
+    return {
+        "courses": {course_name: [timeslot, str(max_students), lecturer]
+                    for course_name, timeslot, max_students, lecturer in parsers.read_courses()},
+        "students": {student_id: [faculty, student_name]
+                     for student_id, faculty, student_name in parsers.read_students()},
+        "enrollment": dict.fromkeys(parsers.read_enrollment(), True),
+        "rooms": conflicts.load_course_rooms(),
+    }
+
+
+def write_state(state):
+    """
+    Overwrites the data files with the given state.
+
+    Inputs: state (dict): State as returned by read_state().
+
+    Returns: None
+    """
+    with open("courses.txt", "w") as f:
+        f.write("\n".join(f"{name}; {timeslot}; {max_students}; {lecturer}"
+                          for name, (timeslot, max_students, lecturer) in state["courses"].items()))
+    with open("students.txt", "w") as f:
+        f.write("\n".join(f"{student_id},{faculty},{student_name}"
+                          for student_id, (faculty, student_name) in state["students"].items()))
+    with open("enrollment.txt", "w") as f:
+        f.write("\n".join(f"{course_name}: {student_id}"
+                          for course_name, student_id in state["enrollment"]))
+    with open("course_rooms.txt", "w") as f:
+        f.write("\n".join(f"{course_name}: {room}"
+                          for course_name, room in state.get("rooms", {}).items()))
+
+
+def apply_event(state, action, args):
+    """
+    Applies a single journal event to an in-memory state.
+
+    Inputs: state (dict): State as returned by read_state(), modified in place.
+            action (str): Name of the recorded action.
+            args (list): Arguments the action was recorded with.
+
+    Returns: None
+    """
+    if action == "enroll":
+        course_name, student_id = args
+        state["enrollment"][(course_name, student_id)] = True
+    elif action == "drop":
+        course_name, student_id = args
+        state["enrollment"].pop((course_name, student_id), None)
+    elif action == "add_student":
+        student_id, faculty, student_name = args
+        state["students"][student_id] = [faculty, student_name]
+    elif action == "remove_student":
+        state["students"].pop(args[0], None)
+    elif action in ("add_course", "edit_course"):
+        course_name, timeslot, max_students, lecturer = args
+        state["courses"][course_name] = [timeslot, str(max_students), lecturer]
+    elif action == "remove_course":
+        state["courses"].pop(args[0], None)
+        state.setdefault("rooms", {}).pop(args[0], None)
+    elif action == "assign_room":
+        course_name, room = args
+        state.setdefault("rooms", {}).pop(course_name, None)
+        if room:
+            state["rooms"][course_name] = room
+    # "restore" events are always followed by a snapshot, so there is nothing to replay
+
+
+def _read_last_seq():
+    """
+    Finds the sequence number of the newest event by reading only the end of the journal.
+
+    Inputs: None
+
+    Returns: int: The newest sequence number, or 0 if the journal is empty.
+    """
+    if not os.path.exists(JOURNAL_FILE):
+        return 0
+    with open(JOURNAL_FILE, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        f.seek(max(0, size - 4096))
+        lines = f.read().splitlines()
+    for line in reversed(lines):
+        try:
+            return json.loads(line)["seq"]
+        except (ValueError, KeyError):
+            continue  # Partial first line of the tail or a damaged line
+    return 0
+
+
+def ensure_baseline():
+    """
+    Takes a snapshot of the data files if there is none yet, so the state from before the
+    first recorded event can be restored. Must be called before the data files are changed,
+    and not while holding the store lock.
+
+    Inputs: None
+
+    Returns: None
+    """
+    global _has_baseline
+    if _has_baseline:
+        return
+    import store  # Imported here because store records its changes through this module
+
+    def snapshot_if_missing():
+        if not os.path.isdir(SNAPSHOT_DIR) or not any(name.endswith(".snap") for name in os.listdir(SNAPSHOT_DIR)):
+            take_snapshot(baseline=True)
+
+    # Under the store lock, so no enroll or drop lands between reading the files and dating them
+    store.run_locked(snapshot_if_missing)
+    _has_baseline = True
+
+
+def record(actor, action, *args, snapshot=True):
+    """
+    Appends an event to the journal, taking a snapshot every SNAPSHOT_EVERY events.
+    Must be called after the data files have been updated for the event, and
+    ensure_baseline() before they were.
+
+    Inputs: actor (str): Who made the change (a student ID or "admin").
+            action (str): Name of the action (e.g. "enroll", "drop", "remove_course").
+            *args: Values needed to replay the action.
+            snapshot (bool): Take the periodic snapshot if one is due. Callers holding a lock
+                             pass False, then call take_snapshot() after releasing it if
+                             snapshot_due() says one is due.
+
+    Returns: dict: The recorded event.
+    """
+    # Other processes append to the same journal, so the newest sequence number is re-read every time
+    event = {"seq": _read_last_seq() + 1, "ts": time.time(), "actor": actor, "action": action, "args": list(args)}
+    with open(JOURNAL_FILE, "a") as f:
+        f.write(json.dumps(event) + "\n")
+
+    if snapshot and snapshot_due(event):
+        take_snapshot()
+    return event
+
+
+def snapshot_due(event):
+    """
+    Tells whether a periodic snapshot should be taken after the given event.
+
+    Inputs: event (dict): An event returned by record().
+
+    Returns: bool: True every SNAPSHOT_EVERY events.
+    """
+    return event["seq"] % SNAPSHOT_EVERY == 0
+
+
+def take_snapshot(baseline=False):
+    """
+    Saves the current data files as a binary snapshot, dated and numbered after the newest
+    journal event once the files have been read.
+
+    Inputs: baseline (bool): Date the snapshot 0 if nothing has been journaled yet, as the files
+                             are then how they have been since before any event.
+
+    Returns: str: Path of the snapshot file.
+    """
+    # The journal position is taken before the files are read and the date after, so a change
+    # another process makes meanwhile is never dated before it happened, and its event is
+    # replayed again on restore (replaying an event twice is harmless)
+    offset = os.path.getsize(JOURNAL_FILE) if os.path.exists(JOURNAL_FILE) else 0
+    state = read_state()
+    event = {"seq": _read_last_seq(), "ts": time.time()}
+    if baseline and event["seq"] == 0:
+        event["ts"] = 0.0
+    snapshot = {"seq": event["seq"], "ts": event["ts"], "offset": offset, "state": state}
+
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    # Timestamp and sequence number go in the file name so restore can pick a snapshot without opening them
+    path = os.path.join(SNAPSHOT_DIR, f"{event['ts']:.6f}_{event['seq']}.snap")
+    with open(path + ".tmp", "wb") as f:
+        pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(path + ".tmp", path)
+    return path
+
+
+def find_snapshot(timestamp):
+    """
+    Finds the newest snapshot taken at or before the given time.
+
+    Inputs: timestamp (float): Point in time as seconds since the epoch.
+
+    Returns: str: Path of the snapshot, or None if there is no snapshot that old.
+    """
+    best = None
+    if not os.path.isdir(SNAPSHOT_DIR):
+        return None
+    for name in os.listdir(SNAPSHOT_DIR):
+        if not name.endswith(".snap"):
+            continue
+        ts, seq = name[:-len(".snap")].split("_")
+        key = (float(ts), int(seq))
+        if key[0] <= timestamp and (best is None or key > best[0]):
+            best = (key, name)
+    return os.path.join(SNAPSHOT_DIR, best[1]) if best else None
+
+
+def state_at(timestamp):
+    """
+    Rebuilds the state as of the given time from the nearest snapshot plus the journal tail.
+
+    Inputs: timestamp (float): Point in time as seconds since the epoch.
+
+    Returns: tuple: The rebuilt state and the number of events replayed, or (None, 0) if
+                    the journal does not reach back that far.
+    """
+    path = find_snapshot(timestamp)
+    if path is None:
+        return None, 0
+    with open(path, "rb") as f:
+        snapshot = pickle.load(f)
+
+    state = snapshot["state"]
+    replayed = 0
+    with open(JOURNAL_FILE, "rb") as f:
+        f.seek(snapshot["offset"])  # Skip everything the snapshot already contains
+        for line in f:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue  # Line cut short by a crash
+            if event["ts"] > timestamp:
+                break
+            apply_event(state, event["action"], event["args"])
+            replayed += 1
+    return state, replayed
+
+
+def restore(timestamp, actor="admin"):
+    """
+    Restores the data files to how they were at the given time.
+
+    Inputs: timestamp (float): Point in time as seconds since the epoch.
+            actor (str): Who requested the restore.
+
+    Returns: int: Number of journal events replayed on top of the snapshot, or None if
+                  there is no snapshot old enough.
+    """
+    state, replayed = state_at(timestamp)
+    if state is None:
+        return None
+    import store  # Imported here because store records its changes through this module
+    # Written under the store lock so a concurrent enroll or drop cannot put back the old
+    # enrollment.txt, and every replica reloads it afterwards
+    store.reset(lambda: write_state(state))
+    # Snapshot right after the restore so later restores never replay across it
+    record(actor, "restore", timestamp, snapshot=False)
+    take_snapshot()
+    return replayed
+
+
+def parse_timestamp(text):
+    """
+    Converts "YYYY-MM-DD HH:MM[:SS]" (local time) or seconds since the epoch into a timestamp.
+
+    Inputs: text (str): The time to convert.
+
+    Returns: float: Seconds since the epoch.
+    """
+    try:
+        return float(text)
+    except ValueError:
+        return datetime.fromisoformat(text.strip()).timestamp()
+
+
+def main():
+    if len(sys.argv) == 3 and sys.argv[1] == "restore":
+        timestamp = parse_timestamp(sys.argv[2])
+        start = time.perf_counter()
+        replayed = restore(timestamp)
+        if replayed is None:
+            print("No snapshot exists at or before that time. Nothing was restored.")
+        else:
+            print(f"Restored state as of {datetime.fromtimestamp(timestamp)} "
+                  f"({replayed} events replayed in {time.perf_counter() - start:.2f}s).")
+    elif len(sys.argv) == 2 and sys.argv[1] == "snapshot":
+        print(f"Snapshot saved to {take_snapshot()}")
+    else:
+        print("Usage: python journal.py restore <time> | python journal.py snapshot")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,19 @@
 # Author: Hasan Khan
 # Collaborators/references: https://www.w3schools.com/python/ref_string_ljust.asp
 #----------------------------------------------------
+import sys
+from collections import Counter
+import store
+import catalog
+import parsers
+
+DAY_HEADERS = ['Mon', 'Tues', 'Wed', 'Thurs', 'Fri']
+DAY_CODES = ['MWF', 'TR', 'MWF', 'TR', 'MWF']
+TIMES = ['8:00', '8:30', '9:00', '9:30', '10:00', '10:30', '11:00', '11:30', 
+         '12:00', '12:30', '13:00', '13:30', '14:00', '14:30', '15:00', '15:30', '16:00', '16:30']
+CELL_WIDTH = 12
+
+_grid_cache = {}
 
 def welcome_to_beartracks():
     """
@@ -22,14 +35,18 @@ def getAction():
     Prompt the user with possible actions and obtain their choice.
     
     Returns: 
-        str: The user's selected action ('1', '2', '3', or '4') or invalid entry.
+        str: The user's selected action ('1', '2', '3', '4' or '5') or invalid entry.
     """
-    menu_options = "\nWhat would you like to do?\n1. Print timetable\n2. Enroll in course\n3. Drop course\n4. Quit"
+    menu_options = "\nWhat would you like to do?\n1. Print timetable\n2. Enroll in course\n3. Drop course\n4. Quit\n5. Course catalog (or type 'catalog')"
     print(menu_options)    
     action = input("> ")
-    while action not in ['1', '2', '3', '4']:
-        print("Sorry, invalid entry. Please enter a choice from 1 to 4.")
+    if action.strip().lower() == 'catalog':
+        action = '5'
+    while action not in ['1', '2', '3', '4', '5']:
+        print("Sorry, invalid entry. Please enter a choice from 1 to 5.")
         action = input("> ")
+        if action.strip().lower() == 'catalog':
+            action = '5'
     return action
 
 def format_course(course_string):
@@ -58,30 +75,28 @@ def generate_timetable(student_id):
     Returns: dict: Timetable dictionary made for the inputted student.
     """
     # Store courses in a dictionary with course name as key and its details as values
-    courses_data = {}
-    with open("courses.txt", "r") as f:
-        for line in f:
-            course_name, timeslot, max_students, lecturer = map(str.strip, line.split(';'))
-            courses_data[course_name] = {"timeslot": timeslot, "max_students": int(max_students), "lecturer": lecturer}
+    courses_data = parsers.load_courses()
 
-    # Check which courses the student is enrolled in
+    # Check which courses the student is enrolled in, counting every course's seats on the way
     enrolled_courses = []
-    with open("enrollment.txt", "r") as f:
-        for line in f:
-            if ':' in line:  # Only proceed if colon exists in the line
-                course_name, enrolled_student_id = map(str.strip, line.split(':'))
-                if enrolled_student_id == student_id:
-                    enrolled_courses.append(course_name)
+    seat_counts = Counter()
+    for course_name, enrolled_student_id in parsers.read_enrollment():
+        seat_counts[course_name] += 1
+        if enrolled_student_id == student_id:
+            enrolled_courses.append(course_name)
 
     # Construct a timetable
     timetable = {}
     for course in enrolled_courses:
+        if course not in courses_data:
+            print(f"Warning: Course {course} not found in courses.txt. Skipping...")
+            continue
         day_time = courses_data[course]["timeslot"].split()
         day = 'MWF' if 'MWF' in day_time[0] else 'TR' 
         time = day_time[1]    
 
         # Calculates seat count for the specified course
-        seat_count = sum(1 for line in open("enrollment.txt") if course + ':' in line)
+        seat_count = seat_counts[course]
 
         # Calculates the number of open seats for the current course
         open_seats = courses_data[course]["max_students"] - seat_count
@@ -94,6 +109,126 @@ def generate_timetable(student_id):
 
 
 
+def _grid(days):
+    """
+    Builds the parts of the grid that do not depend on the courses, once per set of days.
+    
+    Inputs: days (tuple): (header, day code) pairs, e.g. (('Mon', 'MWF'), ('Tues', 'TR')).
+    
+    Returns: tuple: The header lines and the six separator lines (the pattern repeats every 6 rows).
+    """
+    if days not in _grid_cache:
+        header = " " * 5 + "".join(" " + header.center(CELL_WIDTH) for header, _ in days)
+        header += "\n" + " " * 5 + "+" + "+".join(["-" * CELL_WIDTH for _ in days]) + "+"
+
+        separators = []
+        for row in range(6):
+            joint = "+" if row % 6 == 5 else "|"
+            text = " " * 5 + joint
+            for _, day_code in days:
+                # MWF classes are 2 rows long and TR classes 3 rows long
+                period = 2 if day_code == 'MWF' else 3
+                text += ("-" if row % period == period - 1 else " ") * CELL_WIDTH + joint
+            separators.append(text)
+        _grid_cache[days] = (header, separators)
+    return _grid_cache[days]
+
+def _grid_row(time):
+    """
+    Finds where a start time falls in the repeating 3-hour separator pattern of the grid.
+    
+    Inputs: time (str): A start time such as "9:30".
+    
+    Returns: int: The half-hour row since 8:00, modulo 6.
+    """
+    hours, minutes = time.split(":")
+    return (int(hours) * 60 + int(minutes) - 8 * 60) // 30 % 6
+
+def format_timetable(courses, times=TIMES, days=None):
+    """
+    Formats the timetable as text.
+    
+    Inputs: courses (dict): Dictionary of the courses (from generate_timetable).
+            times (list): Start times to show, one grid row each.
+            days (list): (header, day code) pairs to show as columns. Defaults to Mon-Fri.
+    
+    Returns: str: The timetable, ending with a newline.
+    """
+    days = tuple(days) if days else tuple(zip(DAY_HEADERS, DAY_CODES))
+    header, separators = _grid(days)
+    empty = " " * CELL_WIDTH + "|"
+
+    lines = [header]
+    for time in times:
+        names = [time.ljust(5) + "|"]
+        seats = [" " * 5 + "|"]
+        for _, day_code in days:
+            entry = courses.get(day_code, {}).get(time)
+            if entry:
+                names.append(format_course(entry['course']).center(CELL_WIDTH) + "|")
+                seats.append(str(entry['room']).center(CELL_WIDTH) + "|")
+            else:
+                names.append(empty)
+                seats.append(empty)
+        lines.append("".join(names))
+        lines.append("".join(seats))
+        # The separator depends on the time of day, not on the row's place in a partial range
+        lines.append(separators[_grid_row(time)])
+    return "\n".join(lines) + "\n"
+
+def render_timetable(courses, out, times=TIMES, days=None):
+    """
+    Renders the timetable as text and writes it to a file-like object in a single write.
+    
+    Inputs: courses (dict): Dictionary of the courses (from generate_timetable).
+            out (file): Where to write the timetable (e.g. sys.stdout or an open file).
+            times (list): Start times to show, one grid row each.
+            days (list): (header, day code) pairs to show as columns. Defaults to Mon-Fri.
+    
+    Returns: None
+    """
+    out.write(format_timetable(courses, times, days))
+
+def render_timetables(student_ids, out, times=TIMES, days=None):
+    """
+    Renders the timetables of many students into one file-like object, reading each
+    data file only once.
+    
+    Inputs: student_ids (iterable): IDs of the students, or None for every student.
+            out (file): Where to write the timetables.
+            times (list): Start times to show, one grid row each.
+            days (list): (header, day code) pairs to show as columns. Defaults to Mon-Fri.
+    
+    Returns: int: Number of timetables written.
+    """
+    courses_data = parsers.load_courses()
+    students = parsers.load_students()
+
+    enrolled_courses = {}
+    seat_counts = Counter()
+    for course_name, enrolled_student_id in parsers.read_enrollment():
+        enrolled_courses.setdefault(enrolled_student_id, []).append(course_name)
+        seat_counts[course_name] += 1
+
+    written = 0
+    for student_id in (students if student_ids is None else student_ids):
+        if student_id not in students:
+            continue
+        timetable = {}
+        for course in enrolled_courses.get(student_id, []):
+            if course not in courses_data:
+                continue
+            day_time = courses_data[course]["timeslot"].split()
+            day = 'MWF' if 'MWF' in day_time[0] else 'TR'
+            open_seats = courses_data[course]["max_students"] - seat_counts[course]
+            timetable.setdefault(day, {})[day_time[1]] = {"course": course, "room": open_seats}
+
+        faculty, student_name = students[student_id]
+        out.write(f"Timetable for {student_name.upper()}, in the faculty of {faculty}\n"
+                  + format_timetable(timetable, times, days) + "\n")
+        written += 1
+    return written
+
 def print_timetable(courses):
     """
     Print the timetable in a structured format.
@@ -102,59 +237,7 @@ def print_timetable(courses):
     
     Returns: None
     """    
-    headers = ['Mon', 'Tues', 'Wed', 'Thurs', 'Fri']
-    day_codes = ['MWF', 'TR', 'MWF', 'TR', 'MWF']
-    times = ['8:00', '8:30', '9:00', '9:30', '10:00', '10:30', '11:00', '11:30', 
-             '12:00', '12:30', '13:00', '13:30', '14:00', '14:30', '15:00', '15:30', '16:00', '16:30']
-
-    # Prints header
-    print(" " * 5, end='')
-    for day in headers:
-        print(" "+f"{day.center(12)}", end='')
-    print("\n" + " " * 5 + "+" + "+".join(["-" * 12 for _ in headers]) + "+")
-
-    # Printing for each time
-    for time in times:
-        # Print course names for this time
-        print(time.ljust(5) + "|", end='')  
-        for i, day in enumerate(day_codes):
-            if courses.get(day, {}).get(time):
-                course = format_course(courses[day][time]['course'])
-                print(f"{course.center(12)}|", end='')
-            else:
-                print(" " * 12 + "|", end='')
-        print()
-
-        # Print open seat counts for this time
-        print(" " * 5 + "|", end='') 
-        for i, day in enumerate(day_codes):
-            if courses.get(day, {}).get(time):
-                room = str(courses[day][time]['room'])
-                print(f"{room.center(12)}|", end='')
-            else:
-                print(" " * 12 + "|", end='')
-        text = "\n" + " " * 5
-        if times.index(time) % 6 == 5:
-            text += "+"
-        else:
-            text += "|"
-        for _ in headers:
-            if _ == "Mon" or _ == "Wed" or _ == "Fri":
-                if times.index(time) % 2 == 1:
-                    text += "-" * 12
-                else:
-                    text += " " * 12
-            else:
-                if times.index(time) % 3 == 2:
-                    text += "-" * 12
-                else:
-                    text += " " * 12
-            if times.index(time) % 6 == 5:
-                text += "+"
-            else:
-                text += "|"
-                    
-        print(text)
+    render_timetable(courses, sys.stdout)
 
 def get_valid_student():
     """
@@ -165,11 +248,9 @@ def get_valid_student():
     Returns: tuple: student ID and student name if valid, otherwise (None, None).
     """    
     student_id_input = input(f"\nStudent ID: ").strip()
-    with open("students.txt", "r") as f:
-        for line in f:
-            student_id, faculty, student_name = map(str.strip, line.split(',')) # This maps the str.strip on each element of the list to remove any whitespace infront/behind of str
-            if student_id_input == student_id:
-                return student_id, student_name
+    for student_id, faculty, student_name in parsers.read_students():
+        if student_id_input == student_id:
+            return student_id, student_name
     print("Invalid student ID. Cannot continue with course enrollment.")
     return None, None
 
@@ -181,17 +262,8 @@ def get_valid_course(student_timetable):
     
     Returns: tuple: The course name and its details if valid, otherwise None.
     """
-    course_details = {}
-    course_name_input = input("Course name: ").strip().upper()
-    with open("courses.txt", "r") as f:
-        for line in f:
-            course_name, timeslot, max_students, lecturer = map(str.strip, line.split(';')) 
-            if course_name_input == course_name:
-                course_details = {
-                    "timeslot": timeslot,
-                    "max_students": int(max_students),
-                    "lecturer": lecturer
-                }
+    course_name_input = parsers.normalize_course(input("Course name: "))
+    course_details = parsers.load_courses().get(course_name_input, {})
 
     # Check validity of course
     if not course_details:
@@ -212,13 +284,7 @@ def get_valid_course(student_timetable):
     
 
     # Check seat availability
-    seat_count = 0
-    with open("enrollment.txt", "r") as f:
-        for line in f:
-            if ':' in line:  # Only process if colon exists in the line
-                course_name_in_file, _ = map(str.strip, line.split(':'))
-                if course_name_input == course_name_in_file:
-                    seat_count += 1
+    seat_count = sum(1 for course_name_in_file, _ in parsers.read_enrollment() if course_name_input == course_name_in_file)
 
     if seat_count >= course_details["max_students"]:
         print(f"Cannot enroll. {course_name_input} is already at capacity. Please contact advisor to get on waiting list..")
@@ -237,15 +303,19 @@ def enroll_student_in_course(student_id, student_name, course_name, course_detai
             course_details (dict): Details of the course.
     
     Returns:
-        None
+        bool: True if the student was enrolled, False if another user took the last seat
+              or changed the student's timetable first.
     """    
-    with open("enrollment.txt", "a") as f:
-        f.write(f"\n{course_name}: {student_id}")
+    enrolled, reason = store.enroll(student_id, course_name)
+    if not enrolled:
+        print(reason)
+        return False
     day_time = course_details["timeslot"].split()
     day = 'MWF' if 'MWF' in day_time[0] else 'TR'
     time = day_time[1]    
     
     print(f"{student_name} has successfully been enrolled in {course_name}, on {day} {time}")
+    return True
     
 def is_student_already_enrolled(student_id, course_name):
     """
@@ -256,13 +326,7 @@ def is_student_already_enrolled(student_id, course_name):
     
     Returns: bool: True if the student is already enrolled, False otherwise.
     """
-    with open("enrollment.txt", "r") as f:
-        for line in f:
-            if ':' in line:
-                course_name_in_file, student_id_in_file = map(str.strip, line.split(':'))
-                if course_name_in_file == course_name and student_id_in_file == student_id:
-                    return True
-    return False
+    return (course_name, student_id) in parsers.read_enrollment()
 
     
 def option1():
@@ -276,18 +340,12 @@ def option1():
 
     student_id_input = input(f"\nStudent ID: ").strip()
     
-    with open("students.txt", "r") as e:
-        for line in e:
-            parts = line.split(',')
-            student_id = parts[0].strip()
-            faculty = parts[1].strip()
-            student_name = parts[2].strip()
-            
-            if student_id_input == student_id:
-                print(f"Timetable for {student_name.upper()}, in the faculty of {faculty}")
-                courses = generate_timetable(student_id_input)
-                print_timetable(courses)
-                return
+    for student_id, faculty, student_name in parsers.read_students():
+        if student_id_input == student_id:
+            print(f"Timetable for {student_name.upper()}, in the faculty of {faculty}")
+            courses = generate_timetable(student_id_input)
+            print_timetable(courses)
+            return
             
     print("Invalid student ID. Cannot print timetable.") 
     
@@ -327,13 +385,8 @@ def option3():
         return
 
     # Get the courses the student is enrolled in
-    enrolled_courses = []
-    with open("enrollment.txt", "r") as f:
-        for line in f:
-            if ':' in line:  # Only process if colon exists in the line
-                course_name, enrolled_student_id = map(str.strip, line.split(':'))
-                if enrolled_student_id == student_id:
-                    enrolled_courses.append(course_name)
+    enrolled_courses = [course_name for course_name, enrolled_student_id in parsers.read_enrollment()
+                        if enrolled_student_id == student_id]
 
     # Display courses the student is enrolled in
     if not enrolled_courses:
@@ -345,25 +398,55 @@ def option3():
         print(f"- {course}")
 
     # Ask user which course to drop
-    course_to_drop = input("> ").strip().upper()
+    course_to_drop = parsers.normalize_course(input("> "))
     if course_to_drop not in enrolled_courses:
         print(f"Drop failed. {student_name} is not currently registered in {course_to_drop}.")
         return
 
     # Update the enrollment file
-    with open("enrollment.txt", "r") as f:
-        lines = f.readlines()
-
-    with open("enrollment.txt", "w") as f:
-        for line in lines:
-            if ':' in line:  # Check if the line has a colon before splitting it
-                course_name, enrolled_student_id = map(str.strip, line.split(':'))
-                if not (course_name == course_to_drop and enrolled_student_id == student_id):
-                    f.write(line)
+    dropped, reason = store.drop(student_id, course_to_drop)
+    if not dropped:
+        print(f"Drop failed. {reason}")
+        return
 
     print(f"\n{student_name} has successfully dropped {course_to_drop}.")
 
 
+def option5():
+    """
+    Handles the option '5' to browse the course catalog page by page.
+    
+    Inputs: None
+    
+    Returns: None
+    """
+    print("Filter the catalog (leave blank to show all).")
+    subject = input("Subject: ").strip()
+    days = input("Days (MWF/TR): ").strip()
+    time = input("Start time: ").strip()
+    has_seats = input("Only courses with open seats? (y/n): ").strip().lower() == 'y'
+
+    rows = catalog.filter_catalog(catalog.load_catalog(), subject, days, time, has_seats)
+    if not rows:
+        print("No courses match those filters.")
+        return
+
+    page = 1
+    while True:
+        page_rows, page, total_pages = catalog.paginate(rows, page)
+        print(catalog.format_catalog_page(page_rows))
+        print(f"Page {page} of {total_pages} ({len(rows)} courses)")
+        if total_pages == 1:
+            return
+        choice = input("n = next page, p = previous page, q = back to menu\n> ").strip().lower()
+        if choice == 'n':
+            page += 1
+        elif choice == 'p':
+            page -= 1
+        elif choice == 'q':
+            return
+
+
 def main():
     # Call the welcome_to_beartracks function to print the welcome message
     welcome_to_beartracks()
@@ -379,7 +462,18 @@ def main():
         elif action == "4":
             print("Goodbye")
             exit()
+        elif action == "5":
+            option5()
 
 if __name__ == "__main__":
-    main()
+    if len(sys.argv) >= 2 and sys.argv[1] == "timetables":
+        # Batch mode: python nonstreamlit_ver.py timetables [output file]
+        if len(sys.argv) == 3:
+            with open(sys.argv[2], "w") as out:
+                count = render_timetables(None, out)
+            print(f"Wrote {count} timetables to {sys.argv[2]}")
+        else:
+            render_timetables(None, sys.stdout)
+    else:
+        main()
     
\ No newline at end of file
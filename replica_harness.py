@@ -0,0 +1,119 @@
+#----------------------------------------------------
+# Mini BearTracks - replica harness
+# Purpose of program: Simulate several app replicas enrolling and dropping students in the
+# same data files at once, then check that no course was overbooked, nobody was enrolled
+# twice or in two courses at the same time, and a cache kept current from the change log
+# matches the files.
+#
+# Usage: python replica_harness.py [replicas] [operations per replica]
+#----------------------------------------------------
+import os
+import random
+import shutil
+import sys
+import tempfile
+from collections import Counter
+from multiprocessing import Pool
+
+import conflicts
+import parsers
+import store
+
+COURSES = [  # Small capacities so the courses fill up while the replicas are running
+    ("CMPUT 101", "TR 14:00", 5), ("CMPUT 174", "TR 14:00", 8), ("MATH 100", "MWF 11:00", 6),
+    ("STAT 151", "MWF 8:00", 10), ("ENGL 125", "MWF 11:00", 3), ("MATH 209", "TR 9:30", 7),
+]
+
+
+def replica(args):
+    """
+    Runs one replica: a random mix of enrolls and drops against the shared files.
+
+    Inputs: args (tuple): (data directory, replica number, number of operations)
+
+    Returns: tuple: Number of successful enrolls and drops.
+    """
+    directory, number, operations = args
+    os.chdir(directory)
+    rng = random.Random(number)
+    courses_data = conflicts.load_courses()
+    enrolls = drops = 0
+    for _ in range(operations):
+        student_id = str(100000 + rng.randrange(40))
+        course_name = rng.choice(COURSES)[0]
+        if rng.random() < 0.7:
+            enrolled, _ = store.enroll(student_id, course_name, courses_data)
+            enrolls += enrolled
+        else:
+            dropped, _ = store.drop(student_id, course_name)
+            drops += dropped
+    return enrolls, drops
+
+
+def check(directory, results, cached_seats):
+    """
+    Checks the shared files and a replica cache after a run.
+
+    Inputs: directory (str): The data directory the replicas used.
+            results (list): What each replica returned.
+            cached_seats (Counter): Seat counts of a replica that was loaded before the run
+                                    and only caught up through the change log afterwards.
+
+    Returns: list: A message for each problem found.
+    """
+    problems = []
+    pairs = list(parsers.read_enrollment(os.path.join(directory, "enrollment.txt")))
+
+    for pair, count in Counter(pairs).items():
+        if count > 1:
+            problems.append(f"{pair[1]} is enrolled in {pair[0]} {count} times")
+    seats = Counter(course_name for course_name, _ in pairs)
+    slots = {course_name: timeslot for course_name, timeslot, _ in COURSES}
+    for course_name, timeslot, capacity in COURSES:
+        if seats[course_name] > capacity:
+            problems.append(f"{course_name} is overbooked: {seats[course_name]} of {capacity}")
+    taken = Counter((student_id, slots[course_name]) for course_name, student_id in set(pairs))
+    for (student_id, timeslot), count in taken.items():
+        if count > 1:
+            problems.append(f"{student_id} has {count} courses on {timeslot}")
+
+    enrolls = sum(result[0] for result in results)
+    drops = sum(result[1] for result in results)
+    if enrolls - drops != len(pairs):
+        problems.append(f"{enrolls} enrolls and {drops} drops succeeded but {len(pairs)} enrollments exist")
+    if +cached_seats != seats:
+        problems.append(f"Cached seat counts {dict(+cached_seats)} do not match the file {dict(seats)}")
+    return problems
+
+
+def main():
+    replicas = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    operations = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    start_directory = os.getcwd()
+    directory = tempfile.mkdtemp(prefix="beartracks_")
+    try:
+        with open(os.path.join(directory, "courses.txt"), "w") as f:
+            f.write("\n".join(f"{course_name}; {timeslot}; {capacity}; Staff" for course_name, timeslot, capacity in COURSES))
+        for name in ("enrollment.txt", "students.txt"):
+            open(os.path.join(directory, name), "w").close()
+
+        # Load this process's cache now, so afterwards it has to catch up from the change log alone
+        os.chdir(directory)
+        store.refresh()
+        with Pool(replicas) as pool:
+            results = pool.map(replica, [(directory, number, operations) for number in range(replicas)])
+
+        problems = check(directory, results, store.seat_counts())
+        for problem in problems:
+            print(problem)
+        print(f"{replicas} replicas x {operations} operations: "
+              f"{sum(r[0] for r in results)} enrolls, {sum(r[1] for r in results)} drops, {len(problems)} problem(s).")
+        return 1 if problems else 0
+    finally:
+        os.chdir(start_directory)
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
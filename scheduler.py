@@ -6,10 +6,19 @@
 # Collaborators/references: https://www.w3schools.com/python/ref_string_ljust.asp
 #----------------------------------------------------
 from io import StringIO
+import os
 import sys
 import streamlit as st
 import pandas as pd
 import random
+from collections import Counter
+import journal
+import store
+import catalog
+import conflicts
+import parsers
+import timeslot_solver
+import simulator
 
 def welcome_to_beartracks():
     """
@@ -51,22 +60,15 @@ def generate_timetable(student_id):
     Returns: dict: Timetable dictionary made for the inputted student.
     """
     # Store courses in a dictionary with course name as key and its details as values
-    courses_data = {}
-    with open("courses.txt", "r") as f:
-        for line in f:
-            course_name, timeslot, max_students, lecturer = map(str.strip, line.split(';'))
-            courses_data[course_name] = {"timeslot": timeslot, "max_students": int(max_students), "lecturer": lecturer}
+    courses_data = parsers.load_courses()
 
-    # Initialize enrolled_courses as an empty list
+    # Check which courses the student is enrolled in, counting every course's seats on the way
     enrolled_courses = []
-
-    # Check which courses the student is enrolled in
-    with open("enrollment.txt", "r") as f:
-        for line in f:
-            if ':' in line:  # Only proceed if colon exists in the line
-                course_name, enrolled_student_id = map(str.strip, line.split(':'))
-                if enrolled_student_id == student_id:
-                    enrolled_courses.append(course_name)
+    seat_counts = Counter()
+    for course_name, enrolled_student_id in parsers.read_enrollment():
+        seat_counts[course_name] += 1
+        if enrolled_student_id == student_id:
+            enrolled_courses.append(course_name)
 
     # Construct a timetable
     timetable = {}
@@ -79,7 +81,7 @@ def generate_timetable(student_id):
         time = day_time[1]    
 
         # Calculates seat count for the specified course
-        seat_count = sum(1 for line in open("enrollment.txt") if course + ':' in line)
+        seat_count = seat_counts[course]
 
         # Calculates the number of open seats for the current course
         open_seats = courses_data[course]["max_students"] - seat_count
@@ -145,15 +147,10 @@ def print_timetable(courses):
             
 
 def get_valid_student(student_id_input):
-    with open("students.txt", "r") as f:
-        for line in f:
-            parts = line.strip().split(',')
-            if len(parts) >= 3:
-                student_id = parts[0].strip()
-                faculty = parts[1].strip()
-                student_name = ','.join(parts[2:]).strip()
-                if student_id_input == student_id:
-                    return student_id, student_name
+    student_id_input = student_id_input.strip()
+    for student_id, faculty, student_name in parsers.read_students():
+        if student_id_input == student_id:
+            return student_id, student_name
             
     st.error("Invalid student ID. Cannot continue with course enrollment.")
     return None, None
@@ -162,16 +159,8 @@ def get_valid_course(student_timetable, course_name_input):
     """
     Validates the course name and returns the course name and details if valid.
     """
-    course_details = {}
-    with open("courses.txt", "r") as f:
-        for line in f:
-            course_name, timeslot, max_students, lecturer = map(str.strip, line.split(';'))
-            if course_name_input.upper() == course_name:
-                course_details = {
-                    "timeslot": timeslot,
-                    "max_students": int(max_students),
-                    "lecturer": lecturer
-                }
+    course_name_input = parsers.normalize_course(course_name_input)
+    course_details = parsers.load_courses().get(course_name_input, {})
 
     if not course_details:
         return None
@@ -186,7 +175,7 @@ def get_valid_course(student_timetable, course_name_input):
                 st.warning(f"Schedule conflict: already registered for course on {day_format} {time}.")
                 return None
 
-    seat_count = sum(1 for line in open("enrollment.txt", "r") if course_name_input + ':' in line)
+    seat_count = sum(1 for course_name, _ in parsers.read_enrollment() if course_name == course_name_input)
     if seat_count >= course_details["max_students"]:
         st.warning(f"Cannot enroll. {course_name_input} is already at capacity.")
         return None
@@ -204,15 +193,19 @@ def enroll_student_in_course(student_id, student_name, course_name, course_detai
             course_details (dict): Details of the course.
     
     Returns:
-        None
+        bool: True if the student was enrolled, False if another user took the last seat
+              or changed the student's timetable first.
     """    
-    with open("enrollment.txt", "a") as f:
-        f.write(f"\n{course_name}: {student_id}")
+    enrolled, reason = store.enroll(student_id, course_name)
+    if not enrolled:
+        st.error(reason)
+        return False
     day_time = course_details["timeslot"].split()
     day = 'MWF' if 'MWF' in day_time[0] else 'TR'
     time = day_time[1]    
     
     print(f"{student_name} has successfully been enrolled in {course_name}, on {day} {time}")
+    return True
     
 def is_student_already_enrolled(student_id, course_name):
     """
@@ -223,13 +216,7 @@ def is_student_already_enrolled(student_id, course_name):
     
     Returns: bool: True if the student is already enrolled, False otherwise.
     """
-    with open("enrollment.txt", "r") as f:
-        for line in f:
-            if ':' in line:
-                course_name_in_file, student_id_in_file = map(str.strip, line.split(':'))
-                if course_name_in_file == course_name and student_id_in_file == student_id:
-                    return True
-    return False
+    return (course_name, student_id) in parsers.read_enrollment()
 
     
 def option1():
@@ -264,7 +251,8 @@ def option2():
                         st.warning(f"{student_name} is already enrolled in {course_name}.")
                     else:
                         if st.button("Enroll"):
-                            enroll_student_in_course(student_id, student_name, course_name, course_details)
+                            if not enroll_student_in_course(student_id, student_name, course_name, course_details):
+                                return
                             day_time = course_details["timeslot"].split()
                             day = 'MWF' if 'MWF' in day_time[0] else 'TR'
                             time = day_time[1]
@@ -284,13 +272,8 @@ def option3():
         student_info = get_valid_student(student_id_input)
         if student_info:
             student_id, student_name = student_info
-            enrolled_courses = []
-            with open("enrollment.txt", "r") as f:
-                for line in f:
-                    if ':' in line:
-                        course_name, enrolled_student_id = map(str.strip, line.split(':'))
-                        if enrolled_student_id == student_id:
-                            enrolled_courses.append(course_name)
+            enrolled_courses = [course_name for course_name, enrolled_student_id in parsers.read_enrollment()
+                                if enrolled_student_id == student_id]
 
             if not enrolled_courses:
                 st.write(f"{student_name} is not enrolled in any courses.")
@@ -299,16 +282,10 @@ def option3():
             course_to_drop = st.selectbox("Select course to drop:", enrolled_courses)
             
             if st.button("Drop Course"):
-                # Update the enrollment file
-                with open("enrollment.txt", "r") as f:
-                    lines = f.readlines()
-
-                with open("enrollment.txt", "w") as f:
-                    for line in lines:
-                        if ':' in line:
-                            course_name, enrolled_student_id = map(str.strip, line.split(':'))
-                            if not (course_name == course_to_drop and enrolled_student_id == student_id):
-                                f.write(line)
+                dropped, reason = store.drop(student_id, course_to_drop)
+                if not dropped:
+                    st.error(reason)
+                    return
 
                 st.success(f"{student_name} has successfully dropped {course_to_drop}.")
         else:
@@ -323,11 +300,7 @@ def option4():
             if len(student_id_input) != 6 or not student_id_input.isdigit():
                 st.error("Invalid student ID. Please enter a 6-digit number.")
             else:
-                existing_ids = set()
-                with open("students.txt", "r") as f:
-                    for line in f:
-                        student_id = line.strip().split(",")[0]
-                        existing_ids.add(student_id)
+                existing_ids = set(parsers.load_students())
                 
                 if student_id_input in existing_ids:
                     st.error("Student ID already exists. Please enter a unique ID.")
@@ -340,6 +313,7 @@ def option4():
                     if st.button("Add Student"):
                         with open("students.txt", "a") as f:
                             f.write(f"\n{student_id_input},{faculty_input},{full_name_input}")
+                        journal.record("admin", "add_student", student_id_input, faculty_input, full_name_input)
                         st.success("Student added successfully.")
     else:
         st.error("Incorrect admin password. Access denied.")
@@ -352,8 +326,8 @@ def option5():
         updated_lines = []
         with open("students.txt", "r") as f:
             for line in f:
-                student_id = line.strip().split(",")[0]
-                if student_id == student_id_input:
+                student_id = line.split(",")[0].strip()
+                if student_id == student_id_input.strip():
                     found = True
                 else:
                     updated_lines.append(line)
@@ -361,6 +335,7 @@ def option5():
         if found:
             with open("students.txt", "w") as f:
                 f.writelines(updated_lines)
+            journal.record("admin", "remove_student", student_id_input)
             st.success(f"Student with CCID {student_id_input} has been dropped out.")
         else:
             st.warning(f"Student with CCID {student_id_input} not found.")
@@ -372,29 +347,45 @@ def option6():
     if admin_password == "password123":
         course_name_input = st.text_input("Enter the course name (e.g., CMPUT 101):")
         if course_name_input:
+            course_name_input = parsers.normalize_course(course_name_input)
             course_name_parts = course_name_input.split()
             if len(course_name_parts) != 2:
                 st.error("Invalid course name format. Please enter the course name as 'SUBJECT COURSENUMBER' (e.g., CMPUT 101).")
+            elif course_name_input in conflicts.load_courses():
+                st.error(f"Course {course_name_input} already exists. Use Edit Course to change it.")
             else:
                 day_options = ["MWF", "TR"]
                 day_input = st.selectbox("Select the days:", day_options)
                 
-                times = ['8:00', '9:00', '10:00', '11:00', '12:00', '13:00', '14:00', '15:00', '16:00']
+                # Only the standard start times, so a new course never overlaps a slot it does not share
+                times = timeslot_solver.SLOTS[day_input]
                 selected_time = st.selectbox("Select the time:", times)
                 
                 instructor_name_input = st.text_input("Enter the instructor name:")
                 
                 max_students_input = st.text_input("Enter the maximum number of students:")
                 
+                room_input = st.selectbox("Select the room:", ["(no room)"] + sorted(conflicts.load_rooms()))
+                room = None if room_input == "(no room)" else room_input
+                
                 if st.button("Add Course"):
                     if not instructor_name_input or not max_students_input:
                         st.error("Please fill in all the required fields.")
                     else:
                         try:
                             max_students = int(max_students_input)
-                            with open("courses.txt", "a") as f:
-                                f.write(f"\n{course_name_input}; {day_input} {selected_time}; {max_students}; {instructor_name_input}")
-                            st.success("Course added successfully.")
+                            problems = conflicts.check_course(course_name_input, f"{day_input} {selected_time}", max_students, instructor_name_input, room)
+                            if problems:
+                                for problem in problems:
+                                    st.error(problem)
+                            else:
+                                with open("courses.txt", "a") as f:
+                                    f.write(f"\n{course_name_input}; {day_input} {selected_time}; {max_students}; {instructor_name_input}")
+                                journal.record("admin", "add_course", course_name_input, f"{day_input} {selected_time}", max_students, instructor_name_input)
+                                if room:
+                                    conflicts.set_course_room(course_name_input, room)
+                                    journal.record("admin", "assign_room", course_name_input, room)
+                                st.success("Course added successfully.")
                         except ValueError:
                             st.error("Invalid maximum number of students. Please enter a valid integer.")
     else:
@@ -407,12 +398,12 @@ def option7():
     if admin_password == "password123":
         course_name_input = st.text_input("Enter the course name to remove (e.g., CMPUT 101):")
         if course_name_input:
-            course_name_input = course_name_input.upper()
+            course_name_input = parsers.normalize_course(course_name_input)
             course_found = False
             updated_lines = []
             with open("courses.txt", "r") as f:
                 for line in f:
-                    course_name = line.strip().split(";")[0]
+                    course_name = parsers.normalize_course(line.split(";")[0])
                     if course_name == course_name_input:
                         course_found = True
                     else:
@@ -421,17 +412,172 @@ def option7():
             if course_found:
                 with open("courses.txt", "w") as f:
                     f.writelines(updated_lines)
+                conflicts.set_course_room(course_name_input, None)
+                journal.record("admin", "remove_course", course_name_input)
                 st.success(f"Course {course_name_input} has been removed.")
             else:
                 st.warning(f"Course {course_name_input} not found.")
     else:
         st.error("Incorrect admin password. Access denied.")
 
+def option8():
+    st.subheader("Course Catalog")
+
+    col1, col2, col3 = st.columns(3)
+    subject_input = col1.text_input("Subject (e.g., CMPUT):")
+    day_input = col2.selectbox("Days:", ["Any", "MWF", "TR"])
+    time_input = col3.text_input("Start time (e.g., 9:00):")
+    has_seats_input = st.checkbox("Only show courses with open seats")
+
+    rows = catalog.filter_catalog(catalog.load_catalog(store.seat_counts()), subject_input,
+                                  None if day_input == "Any" else day_input,
+                                  time_input, has_seats_input)
+    if not rows:
+        st.warning("No courses match the selected filters.")
+        return
+
+    total_pages = -(-len(rows) // catalog.PAGE_SIZE)
+    page = st.number_input(f"Page (of {total_pages}):", min_value=1, max_value=total_pages, value=1)
+    page_rows, page, total_pages = catalog.paginate(rows, int(page))
+    st.dataframe(pd.DataFrame(page_rows, columns=["course", "days", "time", "lecturer", "capacity", "open_seats"]),
+                 hide_index=True)
+    st.caption(f"Showing {len(page_rows)} of {len(rows)} matching courses.")
+
+def option9():
+    st.subheader("Edit Course")
+    
+    admin_password = st.text_input("Enter the admin password:", type="password")
+    if admin_password == "password123":
+        courses_data = conflicts.load_courses()
+        if not courses_data:
+            st.warning("There are no courses to edit.")
+            return
+        course_name = st.selectbox("Select the course to edit:", list(courses_data))
+        details = courses_data[course_name]
+        course_rooms = conflicts.load_course_rooms()
+        rooms = conflicts.load_rooms()
+
+        days, time = details["timeslot"].split()
+        day_input = st.selectbox("Days:", ["MWF", "TR"], index=0 if days == "MWF" else 1)
+        # Only the standard start times, so an edited course never straddles two timetable slots
+        times = timeslot_solver.SLOTS[day_input]
+        time_input = st.selectbox("Start time:", times, index=times.index(time) if day_input == days and time in times else 0)
+        instructor_name_input = st.text_input("Instructor name:", value=details["lecturer"])
+        max_students_input = st.text_input("Maximum number of students:", value=str(details["max_students"]))
+        room_options = ["(no room)"] + sorted(rooms)
+        current_room = course_rooms.get(course_name)
+        room_input = st.selectbox("Room:", room_options, index=room_options.index(current_room) if current_room in room_options else 0)
+        room = None if room_input == "(no room)" else room_input
+
+        if st.button("Save Changes"):
+            try:
+                max_students = int(max_students_input)
+            except ValueError:
+                st.error("Invalid maximum number of students. Please enter a valid integer.")
+                return
+            timeslot = f"{day_input} {time_input}"
+            problems = conflicts.check_course(course_name, timeslot, max_students, instructor_name_input, room)
+            if problems:
+                for problem in problems:
+                    st.error(problem)
+                return
+
+            with open("courses.txt", "r") as f:
+                lines = f.readlines()
+            with open("courses.txt", "w") as f:
+                for line in lines:
+                    if parsers.normalize_course(line.split(";")[0]) == course_name:
+                        line = f"{course_name}; {timeslot}; {max_students}; {instructor_name_input}" + ("\n" if line.endswith("\n") else "")
+                    f.write(line)
+            journal.record("admin", "edit_course", course_name, timeslot, max_students, instructor_name_input)
+            if room != current_room:
+                conflicts.set_course_room(course_name, room)
+                journal.record("admin", "assign_room", course_name, room)
+            st.success(f"Course {course_name} has been updated.")
+    else:
+        st.error("Incorrect admin password. Access denied.")
+
+def option10():
+    st.subheader("Course Conflict Audit")
+
+    problems = conflicts.audit()
+    if problems:
+        for problem in problems:
+            st.warning(problem)
+    else:
+        st.success("No lecturer or room conflicts found.")
+
+def option11():
+    st.subheader("Timeslot Solver")
+
+    admin_password = st.text_input("Enter the admin password:", type="password")
+    if admin_password == "password123":
+        demand_options = ["enrollment.txt"] + (["wishlist.txt"] if os.path.exists("wishlist.txt") else [])
+        demand_path = st.selectbox("Student demand from:", demand_options)
+
+        if st.button("Propose Timeslots"):
+            st.session_state["solver_result"] = timeslot_solver.propose(demand_path)
+
+        if "solver_result" in st.session_state:
+            changes, before, after = st.session_state["solver_result"]
+            st.write(f"Student conflicts: {before} now, {after} with the proposed times.")
+            if not changes:
+                st.success("The current timeslots are already the best found.")
+                return
+            st.dataframe(pd.DataFrame(changes, columns=["course", "current", "proposed"]), hide_index=True)
+
+            clashes = timeslot_solver.enrollment_clashes(changes)
+            if clashes:
+                st.warning(f"{len(clashes)} enrolled student(s) would have two courses at the same time:")
+                st.dataframe(pd.DataFrame([(student_id, timeslot, ", ".join(course_names)) for student_id, timeslot, course_names in clashes],
+                                          columns=["student", "timeslot", "courses"]), hide_index=True)
+                confirmed = st.checkbox("Apply anyway and leave these students to resolve their clashes")
+            else:
+                confirmed = True
+
+            if st.button("Apply Proposed Timeslots", disabled=not confirmed):
+                proposed = {course_name: new_timeslot for course_name, _, new_timeslot in changes}
+                with open("courses.txt", "r") as f:
+                    lines = f.readlines()
+                with open("courses.txt", "w") as f:
+                    for line in lines:
+                        course_name = parsers.normalize_course(line.split(";")[0])
+                        if course_name in proposed:
+                            _, _, max_students, lecturer = map(str.strip, line.split(';'))
+                            line = f"{course_name}; {proposed[course_name]}; {max_students}; {lecturer}" + ("\n" if line.endswith("\n") else "")
+                        f.write(line)
+                courses_data = conflicts.load_courses()
+                for course_name, timeslot in proposed.items():
+                    details = courses_data[course_name]
+                    journal.record("admin", "edit_course", course_name, timeslot, details["max_students"], details["lecturer"])
+                del st.session_state["solver_result"]
+                st.success(f"Moved {len(changes)} course(s) to their proposed timeslots.")
+    else:
+        st.error("Incorrect admin password. Access denied.")
+
+def option12():
+    st.subheader("Registration Simulator")
+
+    admin_password = st.text_input("Enter the admin password:", type="password")
+    if admin_password == "password123":
+        runs = st.number_input("Number of simulated runs:", min_value=10, max_value=10000, value=1000, step=100)
+        courses_per_student = st.number_input("Courses each student tries to take:", min_value=1, max_value=8, value=4)
+        students_per_minute = st.number_input("Students arriving per minute:", min_value=1.0, value=50.0)
+
+        if st.button("Run Simulation"):
+            with st.spinner("Simulating registration..."):
+                report = simulator.run(int(runs), int(courses_per_student), students_per_minute)
+            st.dataframe(pd.DataFrame(report), hide_index=True)
+    else:
+        st.error("Incorrect admin password. Access denied.")
+
 def main():
     st.title("Mini-BearTracks")
     st.header("Welcome to Mini-BearTracks")
+    # Snapshot the data files before this session can change them, if nothing has been journaled yet
+    journal.ensure_baseline()
 
-    action = st.sidebar.selectbox("Choose an action", ["Print Timetable", "Enroll in Course", "Drop Course", "Add New Student", "Drop Out", "New Course Offering", "Remove Course", "Quit"])
+    action = st.sidebar.selectbox("Choose an action", ["Print Timetable", "Enroll in Course", "Drop Course", "Add New Student", "Drop Out", "New Course Offering", "Remove Course", "Course Catalog", "Edit Course", "Course Conflict Audit", "Timeslot Solver", "Registration Simulator", "Quit"])
 
     if action == "Print Timetable":
         option1()
@@ -447,6 +593,16 @@ def main():
         option6()
     elif action == "Remove Course":
         option7()
+    elif action == "Course Catalog":
+        option8()
+    elif action == "Edit Course":
+        option9()
+    elif action == "Course Conflict Audit":
+        option10()
+    elif action == "Timeslot Solver":
+        option11()
+    elif action == "Registration Simulator":
+        option12()
     elif action == "Quit":
         st.write("Goodbye")
         sys.exit()
@@ -0,0 +1,237 @@
+#----------------------------------------------------
+# Mini BearTracks - registration-day simulator
+# Purpose of program: Predict which courses will fill and how fast before registration opens.
+# Every student arrives in a random order and tries to enroll in courses drawn from their
+# faculty's demand on top of the courses they already have, using the real capacity and
+# timeslot conflict rules. Many randomized runs
+# are simulated side by side as NumPy arrays (one row per run).
+#
+# demand.txt (optional) holds "FACULTY; COURSE; weight" lines, with "*" as the faculty for
+# demand shared by every faculty. Without it every course is wanted in proportion to its
+# current enrollment plus one.
+#
+# Usage: python simulator.py [runs] [courses per student] [students per minute]
+#----------------------------------------------------
+import os
+import sys
+import time
+
+import numpy as np
+
+import catalog
+import conflicts
+import parsers
+
+
+def load_students():
+    """
+    Reads the ID and faculty of every student.
+
+    Inputs: None
+
+    Returns: list: (student ID, faculty) of each student, in file order.
+    """
+    return [(student_id, faculty) for student_id, faculty, _ in parsers.read_students()]
+
+
+def load_start_courses(student_ids, course_names):
+    """
+    Reads the courses every student is already enrolled in.
+
+    Inputs: student_ids (list): IDs of the students, in simulation order.
+            course_names (list): Names of the courses, in simulation order.
+
+    Returns: np.ndarray: (students x most courses of any student) matrix of course numbers,
+                         padded with -1.
+    """
+    column = {course_name: i for i, course_name in enumerate(course_names)}
+    row = {student_id: i for i, student_id in enumerate(student_ids)}
+    courses_of = [set() for _ in student_ids]
+    for course_name, student_id in parsers.read_enrollment():
+        if course_name in column and student_id in row:
+            courses_of[row[student_id]].add(column[course_name])
+
+    start_courses = np.full((len(student_ids), max(map(len, courses_of), default=0)), -1)
+    for i, courses in enumerate(courses_of):
+        start_courses[i, :len(courses)] = sorted(courses)
+    return start_courses
+
+
+def load_demand(course_names, faculties, seat_counts, errors=None):
+    """
+    Builds the course demand distribution of each faculty. Malformed lines of demand.txt are
+    skipped and reported.
+
+    Inputs: course_names (list): Names of the courses, in simulation order.
+            faculties (list): Distinct faculties to build a distribution for.
+            seat_counts (Counter): Current enrolled students per course.
+            errors (list): Collects a message for each malformed line. Warnings are printed if None.
+
+    Returns: np.ndarray: (faculties x courses) matrix whose rows sum to 1.
+    """
+    column = {course_name: i for i, course_name in enumerate(course_names)}
+    row = {faculty: i for i, faculty in enumerate(faculties)}
+    weights = np.zeros((len(faculties), len(course_names)))
+
+    path = "demand.txt"
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                fields = line.split(';')
+                if len(fields) != 3:
+                    parsers.report(errors, path, line_number, f"expected 3 fields separated by ';', found {len(fields)}")
+                    continue
+                faculty, course_name, weight = map(str.strip, fields)
+                try:
+                    weight = float(weight)
+                except ValueError:
+                    weight = -1.0
+                if not (np.isfinite(weight) and weight >= 0):
+                    parsers.report(errors, path, line_number, f"weight {fields[2].strip()!r} is not a number of at least 0")
+                    continue
+                course_name = parsers.normalize_course(course_name)
+                if course_name not in column:
+                    continue
+                if faculty == "*":
+                    weights[:, column[course_name]] += weight
+                elif faculty.upper() in row:
+                    weights[row[faculty.upper()], column[course_name]] += weight
+    else:
+        weights[:] = [seat_counts[course_name] + 1 for course_name in course_names]
+
+    # A faculty without any demand falls back to picking uniformly
+    weights[weights.sum(axis=1) == 0] = 1
+    return weights / weights.sum(axis=1, keepdims=True)
+
+
+def simulate(capacities, slots, start_seats, student_faculty, demand, runs=1000, courses_per_student=4, seed=None,
+             start_courses=None):
+    """
+    Simulates many registration days at once.
+
+    Inputs: capacities (np.ndarray): Maximum students of each course.
+            slots (np.ndarray): Timeslot number of each course (equal numbers clash).
+            start_seats (np.ndarray): Students already enrolled in each course.
+            student_faculty (np.ndarray): Faculty number of each student (a row of demand).
+            demand (np.ndarray): (faculties x courses) demand distributions.
+            runs (int): Number of randomized runs.
+            courses_per_student (int): How many courses each student tries to enroll in.
+            seed (int): Random seed, for repeatable results.
+            start_courses (np.ndarray): (students x n) course numbers each student is already
+                                        enrolled in, padded with -1. Counted in start_seats.
+
+    Returns: tuple: Three (runs x courses) arrays: the arrival position at which each course
+                    filled (-1 if it never did), students turned away because it was full,
+                    and the final number of enrolled students.
+    """
+    rng = np.random.default_rng(seed)
+    num_students = len(student_faculty)
+    num_courses = len(capacities)
+    rows = np.arange(runs)
+    if start_courses is None:
+        start_courses = np.full((num_students, 0), -1)
+    already = start_courses.shape[1]
+    start_slots = np.where(start_courses >= 0, slots[start_courses], -1)
+
+    # Each run has its own arrival order
+    order = np.argsort(rng.random((runs, num_students)), axis=1)
+    # All faculties' cumulative distributions laid end to end, faculty f covering [f, f + 1),
+    # so one searchsorted draws from a different distribution in every run
+    stacked = (np.cumsum(demand, axis=1) + np.arange(len(demand))[:, None]).ravel()
+
+    seats = np.tile(start_seats, (runs, 1))
+    turned_away = np.zeros((runs, num_courses), dtype=np.int64)
+    filled_at = np.where(seats >= capacities, 0, -1)
+
+    for position in range(num_students):
+        student = order[:, position]
+        faculty = student_faculty[student]
+        draws = rng.random((runs, courses_per_student)) + faculty[:, None]
+        wishes = np.searchsorted(stacked, draws, side="right") - faculty[:, None] * num_courses
+        wishes = np.clip(wishes, 0, num_courses - 1)
+        # A student's current courses count as taken, so they are neither repeated nor clashed with
+        taken_courses = np.full((runs, already + courses_per_student), -1)
+        taken_slots = np.full((runs, already + courses_per_student), -1)
+        taken_courses[:, :already] = start_courses[student]
+        taken_slots[:, :already] = start_slots[student]
+        for choice in range(courses_per_student):
+            course = wishes[:, choice]
+            duplicate = (taken_courses == course[:, None]).any(axis=1)
+            clash = (taken_slots == slots[course][:, None]).any(axis=1)
+            has_seat = seats[rows, course] < capacities[course]
+            wanted = ~duplicate & ~clash
+
+            enrolled = wanted & has_seat
+            seats[rows, course] += enrolled
+            turned_away[rows, course] += wanted & ~has_seat
+            taken_courses[:, already + choice] = np.where(enrolled, course, -1)
+            taken_slots[:, already + choice] = np.where(enrolled, slots[course], -1)
+
+            just_filled = enrolled & (seats[rows, course] == capacities[course])
+            filled_at[rows[just_filled], course[just_filled]] = position
+    return filled_at, turned_away, seats
+
+
+def run(runs=1000, courses_per_student=4, students_per_minute=50.0, seed=None):
+    """
+    Loads the data files, simulates registration and summarizes each course.
+
+    Inputs: runs (int): Number of randomized runs.
+            courses_per_student (int): How many courses each student tries to enroll in.
+            students_per_minute (float): How fast students arrive once registration opens.
+            seed (int): Random seed, for repeatable results.
+
+    Returns: list: One dict per course with course, capacity, fill_chance, fill_minutes,
+                   turned_away and suggested_increase keys, most likely to fill first.
+    """
+    courses_data = conflicts.load_courses()
+    course_names = list(courses_data)
+    seat_counts = catalog.count_enrollments()
+    students = load_students()
+    faculty_names = sorted({faculty for _, faculty in students})
+
+    slot_numbers = {}
+    slots = np.array([slot_numbers.setdefault(conflicts.slot_key(courses_data[name]["timeslot"]), len(slot_numbers))
+                      for name in course_names])
+    capacities = np.array([courses_data[name]["max_students"] for name in course_names])
+    start_seats = np.array([seat_counts[name] for name in course_names])
+    student_faculty = np.array([faculty_names.index(faculty) for _, faculty in students])
+    start_courses = load_start_courses([student_id for student_id, _ in students], course_names)
+    demand = load_demand(course_names, faculty_names, seat_counts)
+
+    filled_at, turned_away, _ = simulate(capacities, slots, start_seats, student_faculty, demand,
+                                         runs, courses_per_student, seed, start_courses)
+
+    report = []
+    filled = filled_at >= 0
+    for i, course_name in enumerate(course_names):
+        fill_chance = filled[:, i].mean()
+        report.append({
+            "course": course_name,
+            "capacity": int(capacities[i]),
+            "fill_chance": float(fill_chance),
+            # Averaged over the runs in which the course filled
+            "fill_minutes": float(filled_at[filled[:, i], i].mean() / students_per_minute) if fill_chance else None,
+            "turned_away": float(turned_away[:, i].mean()),
+            # Enough extra seats to take everyone who was turned away in 9 runs out of 10
+            "suggested_increase": int(np.ceil(np.percentile(turned_away[:, i], 90))),
+        })
+    report.sort(key=lambda row: (-row["fill_chance"], row["fill_minutes"] or 0))
+    return report
+
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    courses_per_student = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    students_per_minute = float(sys.argv[3]) if len(sys.argv) > 3 else 50.0
+
+    start = time.perf_counter()
+    report = run(runs, courses_per_student, students_per_minute)
+    print(f"{'Course':<11}{'Capacity':>9}{'Fills':>7}{'Minutes':>9}{'Turned away':>13}{'Add seats':>11}")
+    for row in report:
+        minutes = f"{row['fill_minutes']:.1f}" if row["fill_minutes"] is not None else "-"
+        print(f"{row['course']:<11}{row['capacity']:>9}{row['fill_chance']:>7.0%}{minutes:>9}"
+              f"{row['turned_away']:>13.1f}{row['suggested_increase']:>11}")
+    print(f"{runs} runs simulated in {time.perf_counter() - start:.1f}s.")
@@ -0,0 +1,304 @@
+#----------------------------------------------------
+# Mini BearTracks - shared enrollment store
+# Purpose of program: Let several app replicas enroll and drop students in the same
+# enrollment.txt without overbooking. Every course and student record has a version number;
+# an enroll or drop is checked against the versions it was decided on (compare-and-swap)
+# and retried if another replica changed one of those records in the meantime.
+#
+# enrollment.version holds the record versions and enrollment.changes is an append-only
+# log of every change, which replicas read from their last position to update their
+# in-memory cache with only what changed.
+#----------------------------------------------------
+import fcntl
+import json
+import os
+import uuid
+from collections import Counter
+
+import conflicts
+import journal
+import parsers
+
+ENROLLMENT_FILE = "enrollment.txt"
+VERSION_FILE = "enrollment.version"
+CHANGES_FILE = "enrollment.changes"
+LOCK_FILE = "enrollment.lock"
+MAX_RETRIES = 20
+
+# This replica's view of enrollment.txt, kept current by refresh()
+_cache = {"generation": None, "offset": 0, "versions": {}, "seats": Counter(), "courses_of": {}}
+
+
+class _Lock:
+    """
+    Holds an exclusive lock on the lock file for the few milliseconds a commit takes. The
+    operating system releases it if the replica holding it crashes, so a lock is never stale.
+    """
+
+    def __enter__(self):
+        self.fd = os.open(LOCK_FILE, os.O_CREAT | os.O_RDWR)
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        fcntl.flock(self.fd, fcntl.LOCK_UN)
+        os.close(self.fd)
+
+
+def _read_versions():
+    """
+    Reads the record versions shared by all replicas.
+
+    Inputs: None
+
+    Returns: dict: {"generation": str, "versions": {record key: version}}, or None if there is no version file yet.
+    """
+    try:
+        with open(VERSION_FILE, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _write_versions(data):
+    """
+    Atomically replaces the version file. Must be called while holding the lock.
+
+    Inputs: data (dict): Contents as returned by _read_versions().
+
+    Returns: None
+    """
+    with open(VERSION_FILE + ".tmp", "w") as f:
+        json.dump(data, f)
+    os.replace(VERSION_FILE + ".tmp", VERSION_FILE)
+
+
+def _apply(op, course_name, student_id):
+    """
+    Applies one enroll or drop to the in-memory cache.
+
+    Inputs: op (str): "enroll" or "drop".
+            course_name (str): Name of the course.
+            student_id (str): ID of the student.
+
+    Returns: None
+    """
+    courses = _cache["courses_of"].setdefault(student_id, set())
+    if op == "enroll" and course_name not in courses:
+        courses.add(course_name)
+        _cache["seats"][course_name] += 1
+    elif op == "drop" and course_name in courses:
+        courses.discard(course_name)
+        _cache["seats"][course_name] -= 1
+    for key in (f"course:{course_name}", f"student:{student_id}"):
+        _cache["versions"][key] = _cache["versions"].get(key, 0) + 1
+
+
+def _full_load():
+    """
+    Rebuilds the cache from enrollment.txt. Must be called while holding the lock.
+
+    Inputs: None
+
+    Returns: None
+    """
+    data = _read_versions()
+    if data is None:
+        # First use (or reset): start a new change log
+        data = {"generation": uuid.uuid4().hex, "versions": {}}
+        open(CHANGES_FILE, "w").close()
+        _write_versions(data)
+
+    seats = Counter()
+    courses_of = {}
+    for course_name, student_id in parsers.read_enrollment(ENROLLMENT_FILE):
+        if course_name not in courses_of.setdefault(student_id, set()):
+            courses_of[student_id].add(course_name)
+            seats[course_name] += 1
+    _cache.update(generation=data["generation"], versions=dict(data["versions"]), seats=seats,
+                  courses_of=courses_of, offset=os.path.getsize(CHANGES_FILE) if os.path.exists(CHANGES_FILE) else 0)
+
+
+def refresh():
+    """
+    Brings this replica's cache up to date by applying only the changes made since it was
+    last refreshed. Falls back to a full reload after a reset.
+
+    Inputs: None
+
+    Returns: None
+    """
+    data = _read_versions()
+    if data is None or data["generation"] != _cache["generation"]:
+        with _Lock():
+            _full_load()
+        return
+
+    with open(CHANGES_FILE, "rb") as f:
+        f.seek(_cache["offset"])
+        for line in f:
+            if not line.endswith(b"\n"):
+                break  # Another replica is still writing this line
+            _cache["offset"] += len(line)
+            op, course_name, student_id = line.decode().rstrip("\n").split(";")
+            _apply(op, course_name, student_id)
+
+
+def run_locked(action):
+    """
+    Runs a function while holding the store lock, so no enroll or drop commits meanwhile.
+
+    Inputs: action (function): What to run. Must not call enroll(), drop() or reset().
+
+    Returns: Whatever the function returns.
+    """
+    with _Lock():
+        return action()
+
+
+def reset(write=None):
+    """
+    Tells every replica to reload enrollment.txt from scratch. Call after enrollment.txt is
+    rewritten by anything other than enroll() or drop(), or pass the rewrite in so no commit
+    can run between it and the reset (e.g. a journal restore).
+
+    Inputs: write (function): Rewrites the data files while holding the lock. Optional.
+
+    Returns: None
+    """
+    with _Lock():
+        if write is not None:
+            write()
+        if os.path.exists(VERSION_FILE):
+            os.remove(VERSION_FILE)
+        _full_load()
+
+
+def _commit(op, course_name, student_id, expected, write):
+    """
+    Performs a change if none of its records changed since the replica read them.
+
+    Inputs: op (str): "enroll" or "drop".
+            course_name (str): Name of the course.
+            student_id (str): ID of the student.
+            expected (dict): Record key -> version the decision was based on.
+            write (function): Updates enrollment.txt. Only called if the versions still match.
+
+    Returns: bool: True if the change was made, False if another replica got there first.
+    """
+    journal.ensure_baseline()
+    with _Lock():
+        data = _read_versions()
+        if data is None or data["generation"] != _cache["generation"]:
+            return False
+        if any(data["versions"].get(key, 0) != version for key, version in expected.items()):
+            return False
+
+        write()
+        with open(CHANGES_FILE, "a") as f:
+            f.write(f"{op};{course_name};{student_id}\n")
+        for key in expected:
+            data["versions"][key] = data["versions"].get(key, 0) + 1
+        _write_versions(data)
+        event = journal.record(student_id, op, course_name, student_id, snapshot=False)
+    # Snapshots read every data file, so they are taken without holding up the other replicas
+    if journal.snapshot_due(event):
+        journal.take_snapshot()
+    return True
+
+
+def seat_counts():
+    """
+    Returns the up-to-date number of enrolled students of every course.
+
+    Inputs: None
+
+    Returns: Counter: course name -> number of enrolled students
+    """
+    refresh()
+    return Counter(_cache["seats"])
+
+
+def enrolled_courses(student_id):
+    """
+    Returns the courses a student is enrolled in.
+
+    Inputs: student_id (str): ID of the student.
+
+    Returns: set: Names of the student's courses.
+    """
+    refresh()
+    return set(_cache["courses_of"].get(student_id, ()))
+
+
+def enroll(student_id, course_name, courses_data=None):
+    """
+    Enrolls a student in a course unless it is full, the student is already in it or it
+    clashes with the student's timetable, retrying if another replica changes the course or
+    the student at the same time.
+
+    Inputs: student_id (str): ID of the student.
+            course_name (str): Name of the course.
+            courses_data (dict): Courses from conflicts.load_courses(), read if not given.
+
+    Returns: tuple: (True, None) on success, otherwise (False, reason).
+    """
+    if courses_data is None:
+        courses_data = conflicts.load_courses()
+    if course_name not in courses_data:
+        return False, f"Invalid course name {course_name}."
+    slot = conflicts.slot_key(courses_data[course_name]["timeslot"])
+
+    def write():
+        with open(ENROLLMENT_FILE, "a") as f:
+            f.write(f"\n{course_name}: {student_id}")
+
+    for _ in range(MAX_RETRIES):
+        refresh()
+        courses = _cache["courses_of"].get(student_id, set())
+        if course_name in courses:
+            return False, f"Already enrolled in {course_name}."
+        if _cache["seats"][course_name] >= courses_data[course_name]["max_students"]:
+            return False, f"Cannot enroll. {course_name} is already at capacity."
+        for other in courses:
+            if other in courses_data and conflicts.slot_key(courses_data[other]["timeslot"]) == slot:
+                return False, f"Schedule conflict: already registered for {other} on {slot[0]} {slot[1]}."
+
+        expected = {key: _cache["versions"].get(key, 0) for key in (f"course:{course_name}", f"student:{student_id}")}
+        if _commit("enroll", course_name, student_id, expected, write):
+            return True, None
+    return False, "Registration is very busy right now. Please try again."
+
+
+def drop(student_id, course_name):
+    """
+    Drops a student from a course, retrying if another replica changes the course or the
+    student at the same time.
+
+    Inputs: student_id (str): ID of the student.
+            course_name (str): Name of the course.
+
+    Returns: tuple: (True, None) on success, otherwise (False, reason).
+    """
+    def write():
+        # Only the dropped row is removed; every other line is kept exactly as it was, including
+        # rows the parser reports as malformed
+        with open(ENROLLMENT_FILE, "r") as f:
+            kept = []
+            for line in f:
+                name, _, enrolled_student_id = line.partition(':')
+                if (parsers.normalize_course(name), enrolled_student_id.strip()) != (course_name, student_id):
+                    kept.append(line)
+        # Replace the file in one step so replicas reading it never see it half written
+        with open(ENROLLMENT_FILE + ".tmp", "w") as f:
+            f.write("".join(kept).rstrip("\n"))
+        os.replace(ENROLLMENT_FILE + ".tmp", ENROLLMENT_FILE)
+
+    for _ in range(MAX_RETRIES):
+        refresh()
+        if course_name not in _cache["courses_of"].get(student_id, set()):
+            return False, f"Not currently registered in {course_name}."
+        expected = {key: _cache["versions"].get(key, 0) for key in (f"course:{course_name}", f"student:{student_id}")}
+        if _commit("drop", course_name, student_id, expected, write):
+            return True, None
+    return False, "Registration is very busy right now. Please try again."
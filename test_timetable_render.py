@@ -0,0 +1,48 @@
+#----------------------------------------------------
+# Checks for the text timetable renderer in nonstreamlit_ver.py
+#
+# Usage: python -m pytest test_timetable_render.py
+#----------------------------------------------------
+import io
+
+import nonstreamlit_ver as cli
+
+COURSES = {"MWF": {"9:00": {"course": "STAT 151", "room": 12}},
+           "TR": {"8:00": {"course": "CMPUT 274", "room": 3}}}
+
+
+def separator_after(text, time):
+    """Returns the separator line drawn under the given start time's rows."""
+    lines = text.splitlines()
+    row = next(i for i, line in enumerate(lines) if line.startswith(time.ljust(5) + "|"))
+    return lines[row + 2]
+
+
+def test_partial_range_matches_full_grid():
+    full = cli.format_timetable(COURSES)
+    partial = cli.format_timetable(COURSES, times=cli.TIMES[1:7])
+    for time in cli.TIMES[1:7]:
+        assert separator_after(partial, time) == separator_after(full, time)
+
+
+def test_mwf_block_closes_after_two_rows_in_partial_range():
+    partial = cli.format_timetable(COURSES, times=cli.TIMES[1:7])
+    # Mon column: MWF 9:00 runs through 9:30 and closes below it, not below 9:00
+    assert separator_after(partial, "9:00")[6:18] == " " * 12
+    assert separator_after(partial, "9:30")[6:18] == "-" * 12
+    # Tues column: TR 8:00 runs to 9:20, so its block closes below 9:00
+    assert separator_after(partial, "9:00")[19:31] == "-" * 12
+    assert separator_after(partial, "9:30")[19:31] == " " * 12
+
+
+def test_batch_render_writes_once_per_timetable():
+    class CountingBuffer(io.StringIO):
+        writes = 0
+
+        def write(self, text):
+            self.writes += 1
+            return super().write(text)
+
+    out = CountingBuffer()
+    written = cli.render_timetables(None, out)
+    assert out.writes == written
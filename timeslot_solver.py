@@ -0,0 +1,260 @@
+#----------------------------------------------------
+# Mini BearTracks - timeslot solver
+# Purpose of program: Propose course timeslots that keep courses students take together apart.
+# Builds a conflict graph whose edge weights are the number of students in (or wishing for)
+# both courses, colours it greedily with the timeslots, then improves the result with local
+# search. Lecturers and rooms are never double-booked and lecturers are only given slots
+# they are available for.
+#
+# availability.txt (optional) holds "Lecturer Name; MWF 9:00, TR 14:00" lines. Lecturers
+# without a line are available at every slot.
+#
+# Usage: python timeslot_solver.py [enrollment.txt | wishlist.txt]
+#----------------------------------------------------
+import os
+import sys
+import time
+from itertools import combinations
+
+import conflicts
+import parsers
+
+SLOTS = {
+    "MWF": ['8:00', '9:00', '10:00', '11:00', '12:00', '13:00', '14:00', '15:00', '16:00'],
+    "TR": ['8:00', '9:30', '11:00', '12:30', '14:00', '15:30'],
+}
+
+
+def load_demand(path="enrollment.txt"):
+    """
+    Reads which courses each student is enrolled in (or wishes to take).
+
+    Inputs: path (str): A file of "COURSE: student ID" lines, such as enrollment.txt or a wishlist.
+
+    Returns: dict: student ID -> set of course names
+    """
+    demand = {}
+    for course_name, student_id in parsers.read_enrollment(path):
+        demand.setdefault(student_id, set()).add(course_name)
+    return demand
+
+
+def load_availability(errors=None):
+    """
+    Reads the slots each lecturer is available for. Malformed lines are skipped and reported.
+
+    Inputs: errors (list): Collects a message for each malformed line. Warnings are printed if None.
+
+    Returns: dict: upper-cased lecturer name -> set of slot keys (see conflicts.slot_key)
+    """
+    availability = {}
+    path = "availability.txt"
+    if not os.path.exists(path):
+        return availability
+    with open(path, "r") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            lecturer, separator, slots = line.partition(';')
+            lecturer = " ".join(lecturer.split()).upper()
+            if not separator or not lecturer:
+                parsers.report(errors, path, line_number, "expected 'Lecturer Name; MWF 9:00, TR 14:00'")
+                continue
+            available = set()
+            for slot in filter(str.strip, slots.split(',')):
+                timeslot = parsers.normalize_timeslot(slot)
+                if timeslot is None:
+                    parsers.report(errors, path, line_number, f"timeslot {slot.strip()!r} is not like 'MWF 9:00' or 'TR 14:00'")
+                    break
+                available.add(conflicts.slot_key(timeslot))
+            else:
+                availability[lecturer] = available
+    return availability
+
+
+def build_conflict_graph(demand, courses_data):
+    """
+    Builds the weighted co-enrollment graph of the courses.
+
+    Inputs: demand (dict): student ID -> set of course names, from load_demand().
+            courses_data (dict): Courses from conflicts.load_courses(). Unknown courses are ignored.
+
+    Returns: dict: course name -> {other course name: number of students taking both}
+    """
+    graph = {course_name: {} for course_name in courses_data}
+    for wanted in demand.values():
+        wanted = sorted(course_name for course_name in wanted if course_name in graph)
+        for first, second in combinations(wanted, 2):
+            graph[first][second] = graph[first].get(second, 0) + 1
+            graph[second][first] = graph[second].get(first, 0) + 1
+    return graph
+
+
+def count_conflicts(assignment, graph):
+    """
+    Counts the weighted student conflicts of an assignment.
+
+    Inputs: assignment (dict): course name -> slot key.
+            graph (dict): Conflict graph from build_conflict_graph().
+
+    Returns: int: Number of (student, course pair) clashes.
+    """
+    total = 0
+    for course_name, neighbours in graph.items():
+        for other, weight in neighbours.items():
+            if course_name < other and assignment[course_name] == assignment[other]:
+                total += weight
+    return total
+
+
+def solve(courses_data, graph, course_rooms=None, availability=None, time_limit=5.0):
+    """
+    Proposes a timeslot for every course.
+
+    Inputs: courses_data (dict): Courses from conflicts.load_courses().
+            graph (dict): Conflict graph from build_conflict_graph().
+            course_rooms (dict): Room assignments. Read from course_rooms.txt if not given.
+            availability (dict): Lecturer availability. Read from availability.txt if not given.
+            time_limit (float): Seconds the local search may run for.
+
+    Returns: dict: course name -> proposed slot key. Courses that can be placed in no slot keep their current one.
+    """
+    if course_rooms is None:
+        course_rooms = conflicts.load_course_rooms()
+    if availability is None:
+        availability = load_availability()
+
+    current = {course_name: conflicts.slot_key(details["timeslot"]) for course_name, details in courses_data.items()}
+    lecturers = {course_name: details["lecturer"].upper() for course_name, details in courses_data.items()}
+    # Who and what is already booked in each slot, so lecturer and room checks are dict lookups
+    booked = {}
+
+    def resources(course_name):
+        keys = []
+        if lecturers[course_name] not in conflicts.UNASSIGNED_LECTURERS:
+            keys.append(("lecturer", lecturers[course_name]))
+        if course_rooms.get(course_name):
+            keys.append(("room", course_rooms[course_name]))
+        return keys
+
+    def candidates(course_name):
+        days = current[course_name][0]
+        allowed = availability.get(lecturers[course_name])
+        slots = []
+        for time_of_day in SLOTS.get(days, [current[course_name][1]]):
+            slot = (days, time_of_day)
+            if allowed is not None and slot not in allowed:
+                continue
+            if any(booked.get((key, slot), course_name) != course_name for key in resources(course_name)):
+                continue
+            slots.append(slot)
+        return slots
+
+    def slot_costs(course_name, assignment):
+        costs = {}
+        for other, weight in graph[course_name].items():
+            slot = assignment.get(other)
+            if slot is not None:
+                costs[slot] = costs.get(slot, 0) + weight
+        return costs
+
+    def place(course_name, slot, assignment):
+        old = assignment.get(course_name)
+        for key in resources(course_name):
+            if old is not None and booked.get((key, old)) == course_name:
+                del booked[(key, old)]
+            booked[(key, slot)] = course_name
+        assignment[course_name] = slot
+
+    # Greedy colouring, most constrained (highest weighted degree) courses first
+    assignment = {}
+    order = sorted(courses_data, key=lambda course_name: -sum(graph[course_name].values()))
+    for course_name in order:
+        slots = candidates(course_name)
+        if not slots:
+            place(course_name, current[course_name], assignment)
+            continue
+        costs = slot_costs(course_name, assignment)
+        # Cheapest slot; on ties keep the current time so the timetable changes as little as possible
+        best = min(slots, key=lambda slot: (costs.get(slot, 0), slot != current[course_name]))
+        place(course_name, best, assignment)
+
+    # Local search: move single courses to strictly better slots until nothing improves
+    deadline = time.perf_counter() + time_limit
+    improved = True
+    while improved and time.perf_counter() < deadline:
+        improved = False
+        for course_name in order:
+            if not graph[course_name]:
+                continue
+            costs = slot_costs(course_name, assignment)
+            now = costs.get(assignment[course_name], 0)
+            if now == 0:
+                continue
+            slots = candidates(course_name)
+            if not slots:
+                continue
+            best = min(slots, key=lambda slot: costs.get(slot, 0))
+            if costs.get(best, 0) < now:
+                place(course_name, best, assignment)
+                improved = True
+    return assignment
+
+
+def propose(demand_path="enrollment.txt", time_limit=5.0):
+    """
+    Loads the data files and proposes new timeslots.
+
+    Inputs: demand_path (str): Where to read student demand from.
+            time_limit (float): Seconds the local search may run for.
+
+    Returns: tuple: The proposed changes as a list of (course name, current timeslot, proposed timeslot),
+                    and the number of student conflicts before and after.
+    """
+    courses_data = conflicts.load_courses()
+    graph = build_conflict_graph(load_demand(demand_path), courses_data)
+    current = {course_name: conflicts.slot_key(details["timeslot"]) for course_name, details in courses_data.items()}
+    assignment = solve(courses_data, graph, time_limit=time_limit)
+
+    changes = [(course_name, courses_data[course_name]["timeslot"], " ".join(slot))
+               for course_name, slot in assignment.items() if slot != current[course_name]]
+    return changes, count_conflicts(current, graph), count_conflicts(assignment, graph)
+
+
+def enrollment_clashes(changes, courses_data=None):
+    """
+    Finds the enrolled students who would have two courses at the same time if the proposed
+    changes were applied.
+
+    Inputs: changes (list): (course name, current timeslot, proposed timeslot) from propose().
+            courses_data (dict): Courses from conflicts.load_courses(), read if not given.
+
+    Returns: list: (student ID, timeslot, [course names]) for every new clash.
+    """
+    if courses_data is None:
+        courses_data = conflicts.load_courses()
+    slots = {course_name: conflicts.slot_key(details["timeslot"]) for course_name, details in courses_data.items()}
+    moved = {course_name: conflicts.slot_key(new_timeslot) for course_name, _, new_timeslot in changes}
+
+    clashes = []
+    for student_id, course_names in load_demand().items():
+        if moved.keys().isdisjoint(course_names):
+            continue
+        by_slot = {}
+        for course_name in sorted(course_names):
+            if course_name in slots:
+                by_slot.setdefault(moved.get(course_name, slots[course_name]), []).append(course_name)
+        for slot, together in by_slot.items():
+            if len(together) > 1:
+                clashes.append((student_id, " ".join(slot), together))
+    return clashes
+
+
+if __name__ == "__main__":
+    demand_path = sys.argv[1] if len(sys.argv) > 1 else "enrollment.txt"
+    changes, before, after = propose(demand_path)
+    for course_name, old_timeslot, new_timeslot in changes:
+        print(f"{course_name}: {old_timeslot} -> {new_timeslot}")
+    print(f"Student conflicts: {before} now, {after} with the proposed times ({len(changes)} course(s) moved).")
+    for student_id, timeslot, course_names in enrollment_clashes(changes):
+        print(f"Enrolled student {student_id} would have {', '.join(course_names)} together on {timeslot}")